@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analisi approssimata delle domande tramite campionamento stratificato
+
+Invece di leggere tutti i PDF ne legge un campione casuale per ogni anno
+(lo strato) e stima la frequenza di ogni domanda nell'intero archivio con
+un intervallo di confidenza. Il campione viene ampliato a ogni giro finché
+si raggiunge la quota richiesta o finisce il tempo a disposizione, così
+le stime si raffinano progressivamente.
+"""
+
+import math
+import random
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from config import APPROX_FRACTION, APPROX_ROUND_FRACTION, APPROX_Z
+from pdf_archive import iter_pdf_sources
+from question_partitions import parse_exam_date
+from safe_extract import extract_safely, load_quarantine
+
+class StratifiedEstimate:
+    """Somme per strato necessarie allo stimatore stratificato del totale"""
+
+    def __init__(self, strata_sizes):
+        self.sizes = strata_sizes  # {anno: numero di PDF nello strato}
+        self.sampled = Counter()  # {anno: PDF campionati}
+        self.sums = {year: Counter() for year in strata_sizes}
+        self.squares = {year: Counter() for year in strata_sizes}
+
+    def add(self, year, questions):
+        self.sampled[year] += 1
+        for question, count in Counter(questions).items():
+            self.sums[year][question] += count
+            self.squares[year][question] += count * count
+
+    def estimate(self, z=APPROX_Z):
+        """Restituisce (domande, stima, minimo, massimo, osservate) come array"""
+        questions = sorted({q for counter in self.sums.values() for q in counter})
+        total = np.zeros(len(questions))
+        variance = np.zeros(len(questions))
+        observed = np.zeros(len(questions))
+
+        for year, size in self.sizes.items():
+            n = self.sampled[year]
+            if n == 0 or size == 0:
+                continue
+            sums = np.array([self.sums[year][q] for q in questions], dtype=float)
+            squares = np.array([self.squares[year][q] for q in questions], dtype=float)
+            mean = sums / n
+            if n > 1:
+                sample_var = np.maximum(squares - n * mean ** 2, 0) / (n - 1)
+            else:
+                # Con un solo PDF la varianza non è stimabile: massimo di una Bernoulli
+                sample_var = np.full(len(questions), 0.25)
+            total += size * mean
+            variance += size ** 2 * (1 - n / size) * sample_var / n
+            observed += sums
+
+        margin = z * np.sqrt(variance)
+        return questions, total, np.maximum(total - margin, observed), total + margin, observed
+
+    def coverage(self):
+        return sum(self.sampled.values()) / max(1, sum(self.sizes.values()))
+
+def _stratify(pdf_folder, seed=None):
+    """Raggruppa le sorgenti per anno, in ordine casuale dentro ogni strato
+
+    I PDF in quarantena (e non cambiati) sono esclusi dalla popolazione come
+    nell'analisi completa.
+    """
+    rng = random.Random(seed)
+    quarantine = load_quarantine()
+    strata = {}
+    for filename, source, firma in iter_pdf_sources(pdf_folder):
+        if filename in quarantine and quarantine[filename].get("firma") == firma:
+            continue
+        year, _ = parse_exam_date(filename)
+        strata.setdefault(year, []).append((filename, source, firma))
+    for items in strata.values():
+        rng.shuffle(items)
+    return strata
+
+def run_approximate(pdf_folder, fraction=APPROX_FRACTION, time_budget=None,
+                    round_fraction=APPROX_ROUND_FRACTION, seed=None, on_round=None):
+    """Campiona i PDF per anno e restituisce la StratifiedEstimate
+
+    Si ferma quando ogni strato ha raggiunto fraction oppure, se indicato,
+    quando scade time_budget (secondi): in quel caso continua a raffinare
+    fino al termine del tempo anche oltre fraction. Allo scadere i PDF in
+    lettura vengono interrotti e restano semplicemente non campionati: non
+    finiscono in quarantena e non riducono lo strato. on_round viene
+    chiamata con la stima dopo ogni giro.
+    """
+    start = time.time()
+    strata = _stratify(pdf_folder, seed)
+    estimate = StratifiedEstimate({year: len(items) for year, items in strata.items()})
+    cursor = Counter()  # PDF già estratti (anche falliti) per strato
+    target = 1.0 if time_budget else fraction
+    step = min(round_fraction, target)
+
+    while True:
+        batch = []
+        for year, items in strata.items():
+            # Almeno un PDF per strato a ogni giro, senza superare l'obiettivo
+            wanted = min(max(1, math.ceil(step * len(items))),
+                         max(0, math.ceil(target * len(items)) - cursor[year]))
+            batch.extend(items[cursor[year]:cursor[year] + wanted])
+            cursor[year] += wanted
+        if not batch:
+            break
+
+        deadline = start + time_budget if time_budget else None
+        results, quarantined = extract_safely([(f, s) for f, s, _ in batch], {f: g for f, _, g in batch},
+                                              deadline=deadline)
+
+        for filename, _, _ in batch:
+            year, _ = parse_exam_date(filename)
+            if filename in results:
+                estimate.add(year, results[filename])
+            elif filename in quarantined:
+                # PDF appena finito in quarantena: escluso dalla popolazione
+                estimate.sizes[year] -= 1
+
+        if on_round:
+            on_round(estimate)
+        if time_budget and time.time() - start >= time_budget:
+            break
+
+    return estimate
+
+def format_estimate(estimate, top=20):
+    """Righe di testo con le domande più frequenti stimate"""
+    questions, total, low, high, _ = estimate.estimate()
+    lines = [f"Campione: {sum(estimate.sampled.values())}/{sum(estimate.sizes.values())} PDF "
+             f"({estimate.coverage()*100:.0f}%), {len(estimate.sizes)} anni"]
+    for k in np.argsort(-total)[:top]:
+        lines.append(f"[~{total[k]:.1f}x, IC95% {low[k]:.1f}-{high[k]:.1f}] {questions[k]}")
+    return lines
+
+def main(pdf_folder="../pdfs", fraction=APPROX_FRACTION, time_budget=None):
+    """Esegue l'analisi approssimata stampando le stime dopo ogni giro"""
+    def show(estimate):
+        print("\n" + "-"*60)
+        for line in format_estimate(estimate, top=10):
+            print(line)
+
+    estimate = run_approximate(pdf_folder, fraction, time_budget, on_round=show)
+
+    output_file = Path(__file__).parent.parent / "output" / "analisi_approssimata.txt"
+    output_file.parent.mkdir(exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("ANALISI APPROSSIMATA (CAMPIONAMENTO STRATIFICATO PER ANNO)\n")
+        f.write("="*70 + "\n\n")
+        for line in format_estimate(estimate, top=None):
+            f.write(line + "\n")
+    print("\n\nStime salvate in '../output/analisi_approssimata.txt'")
@@ -21,4 +21,44 @@ MIN_QUESTION_LENGTH = 10
 
 # Configurazione download
 DOWNLOAD_DELAY = 1  # secondi tra i download
-MAX_RETRIES = 3
\ No newline at end of file
+MAX_RETRIES = 3
+
+# Partizioni per anno/sessione dell'analisi
+PARTITIONS_DIR = "output/partizioni"
+
+# Ricerca domande simili (TF-IDF su n-grammi di caratteri)
+SIMILARITY_INDEX = "output/indice_similarita"
+SIMILARITY_NGRAM_RANGE = (3, 5)
+SIMILARITY_THRESHOLD = 0.5
+
+# Modalità watch della cartella PDF
+WATCH_POLL_INTERVAL = 2  # secondi tra due controlli della cartella
+WATCH_DEBOUNCE = 3  # secondi senza modifiche prima di analizzare
+
+# Servizio HTTP locale per le statistiche
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_RELOAD_INTERVAL = 2  # secondi tra due controlli di nuove analisi
+SERVER_CACHE_SIZE = 256  # risposte tenute in cache (LRU)
+
+# Archivio unico dei PDF (opzionale), dentro la cartella pdfs
+PDF_ARCHIVE_NAME = "compiti.pak"
+
+# Estrazione isolata dei PDF
+EXTRACTION_TIMEOUT = 60  # secondi massimi per un PDF
+EXTRACTION_MEMORY_MB = 512  # memoria massima di un worker
+EXTRACTION_WORKERS = 4  # PDF elaborati in parallelo
+QUARANTINE_FILE = "output/quarantena.json"
+
+# Analisi approssimata per campionamento stratificato (per anno)
+APPROX_FRACTION = 0.2  # quota di PDF campionata per anno
+APPROX_ROUND_FRACTION = 0.1  # quota aggiunta a ogni raffinamento
+APPROX_Z = 1.96  # intervallo di confidenza al 95%
+
+# Modalità streaming: conteggi approssimati a memoria costante
+HEAVY_HITTERS_CAPACITY = 1000  # domande tracciate al massimo
+HEAVY_HITTERS_SKETCH = "output/sketch_domande.json"
+
+# Budget del tempo di import degli script (python -X importtime)
+IMPORT_TIME_BUDGET_MS = 30
+IMPORT_TIME_BUDGET_HEAVY_MS = 500  # script che usano numpy/scipy o asyncio a livello di modulo
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Co-occorrenze delle domande e composizione dei compiti nel tempo
+
+A partire da {filename: [domande]} costruisce una matrice sparsa di
+incidenza compiti x domande e calcola con operazioni vettoriali:
+- quante volte due domande compaiono nello stesso compito, con lift e Jaccard
+- per ogni compito la copertura, cioè la quota di domande già uscite prima
+Il report viene salvato in output/cooccorrenze.txt insieme all'analisi.
+"""
+
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+from question_partitions import parse_exam_date
+
+def incidence_matrix(file_questions):
+    """Matrice binaria (compiti x domande) in ordine cronologico
+
+    Restituisce (matrice CSR, elenco compiti, elenco domande).
+    """
+    exams = sorted(file_questions)
+    questions = sorted({q for qs in file_questions.values() for q in qs})
+    column = {q: i for i, q in enumerate(questions)}
+
+    rows, cols = [], []
+    for row, exam in enumerate(exams):
+        for question in set(file_questions[exam]):
+            rows.append(row)
+            cols.append(column[question])
+
+    data = np.ones(len(rows), dtype=np.int32)
+    matrix = sparse.csr_matrix((data, (rows, cols)), shape=(len(exams), len(questions)))
+    matrix.sort_indices()
+    return matrix, exams, questions
+
+def cooccurrence_pairs(matrix, min_count=2):
+    """Coppie di domande che compaiono insieme almeno min_count volte
+
+    Restituisce array (i, j, conteggio, lift, jaccard) con i < j.
+    """
+    n_exams = matrix.shape[0]
+    support = np.asarray(matrix.sum(axis=0)).ravel()
+
+    pairs = sparse.triu(matrix.T.dot(matrix), k=1).tocoo()
+    keep = pairs.data >= min_count
+    i, j, count = pairs.row[keep], pairs.col[keep], pairs.data[keep].astype(np.float64)
+
+    lift = count * n_exams / (support[i] * support[j])
+    jaccard = count / (support[i] + support[j] - count)
+    return i, j, count.astype(np.int64), lift, jaccard
+
+def exam_coverage(matrix):
+    """Per ogni compito: numero di domande e quota già uscita in compiti precedenti"""
+    # Prima apparizione di ogni domanda: indice di riga minimo della colonna
+    csc = matrix.tocsc()
+    csc.sort_indices()
+    has_rows = np.diff(csc.indptr) > 0
+    first = np.full(matrix.shape[1], -1)
+    first[has_rows] = csc.indices[csc.indptr[:-1][has_rows]]
+
+    coo = matrix.tocoo()
+    seen_before = coo.row > first[coo.col]
+    sizes = np.bincount(coo.row, minlength=matrix.shape[0])
+    repeated = np.bincount(coo.row, weights=seen_before, minlength=matrix.shape[0])
+    coverage = np.divide(repeated, sizes, out=np.zeros(len(sizes)), where=sizes > 0)
+    return sizes, coverage
+
+def save_cooccurrence_report(file_questions, output_file=None, top=50):
+    """Calcola co-occorrenze e copertura e le salva in output/cooccorrenze.txt"""
+    if output_file is None:
+        output_file = Path(__file__).parent.parent / "output" / "cooccorrenze.txt"
+    Path(output_file).parent.mkdir(exist_ok=True)
+
+    matrix, exams, questions = incidence_matrix(file_questions)
+    if matrix.nnz == 0:
+        return None
+    i, j, count, lift, jaccard = cooccurrence_pairs(matrix)
+    sizes, coverage = exam_coverage(matrix)
+
+    years = np.array([parse_exam_date(exam)[0] for exam in exams])
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("CO-OCCORRENZE E COMPOSIZIONE DEI COMPITI\n")
+        f.write("="*70 + "\n\n")
+        f.write(f"Compiti: {len(exams)}  Domande uniche: {len(questions)}  "
+                f"Coppie con almeno 2 co-occorrenze: {len(count)}\n")
+
+        f.write("\nCOPPIE PIÙ FREQUENTI INSIEME:\n")
+        f.write("-"*40 + "\n")
+        for k in np.lexsort((-lift, -count))[:top]:
+            f.write(f"\n[{count[k]}x] lift {lift[k]:.2f}  jaccard {jaccard[k]:.2f}\n")
+            f.write(f"    - {questions[i[k]]}\n")
+            f.write(f"    - {questions[j[k]]}\n")
+
+        f.write("\nCOPERTURA PER ANNO (quota di domande già uscite nei compiti precedenti):\n")
+        f.write("-"*40 + "\n")
+        for year in sorted(set(years)):
+            in_year = years == year
+            f.write(f"  {year}: {in_year.sum()} compiti, {sizes[in_year].mean():.1f} domande/compito, "
+                    f"copertura media {coverage[in_year].mean()*100:.1f}%\n")
+
+        f.write("\nCOPERTURA PER COMPITO:\n")
+        f.write("-"*40 + "\n")
+        for exam, size, cov in zip(exams, sizes, coverage):
+            f.write(f"  {exam}: {size} domande, {cov*100:.0f}% già uscite\n")
+
+    return output_file
+
+def main():
+    """Calcola il report a partire dalle partizioni già salvate"""
+    from question_partitions import merge_file_questions
+
+    output_file = save_cooccurrence_report(merge_file_questions())
+    if output_file is None:
+        print("Nessuna partizione disponibile: esegui prima l'analisi delle domande")
+    else:
+        print(f"Co-occorrenze salvate in '{output_file}'")
+
+if __name__ == "__main__":
+    main()
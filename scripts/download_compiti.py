@@ -5,11 +5,15 @@ Script per scaricare tutti i compiti (PDF e DOC) nella cartella pdfs
 """
 
 import os
-import requests
 from pathlib import Path
 import time
 from urllib.parse import urlparse
-from links_variable import COMPITI_DICT, TOTALE_COMPITI
+from pdf_archive import PdfArchive, get_archive_path
+
+def _load_catalog():
+    """Carica il catalogo generato (links_variable.py) solo quando serve"""
+    import links_variable
+    return links_variable
 
 def create_download_folder(folder_path="pdfs"):
     """Crea la cartella di download se non esiste"""
@@ -22,12 +26,24 @@ def get_filename_from_url(url):
     filename = os.path.basename(parsed_url.path)
     return filename
 
-def download_file(url, filename, folder_path, max_retries=3):
-    """Scarica un singolo file con retry automatico"""
+def download_file(url, filename, folder_path, max_retries=3, archive=None):
+    """Scarica un singolo file con retry automatico
+    
+    Se viene passato un PdfArchive il PDF viene aggiunto all'archivio
+    invece di essere salvato nella cartella; gli altri formati (.doc)
+    vengono comunque salvati nella cartella.
+    """
+    import requests
+    
     file_path = os.path.join(folder_path, filename)
+    if not filename.lower().endswith(".pdf"):
+        archive = None
     
     # Controlla se il file esiste già
-    if os.path.exists(file_path):
+    if archive is not None and filename in archive:
+        print(f"✓ Già nell'archivio: {filename} ({archive.index[filename]['lunghezza']} bytes)")
+        return True
+    if archive is None and os.path.exists(file_path):
         file_size = os.path.getsize(file_path)
         if file_size > 0:  # File non vuoto
             print(f"✓ Già presente: {filename} ({file_size} bytes)")
@@ -45,6 +61,11 @@ def download_file(url, filename, folder_path, max_retries=3):
             response = requests.get(url, headers=headers, timeout=30, stream=True)
             response.raise_for_status()
             
+            if archive is not None:
+                archive.append({filename: response.content})
+                print(f"✅ Aggiunto all'archivio: {filename} ({len(response.content)} bytes)")
+                return True
+            
             # Salva il file
             with open(file_path, 'wb') as f:
                 for chunk in response.iter_content(chunk_size=8192):
@@ -66,12 +87,13 @@ def download_file(url, filename, folder_path, max_retries=3):
 
 def _print_download_stats(success_count, failed_files):
     """Stampa le statistiche finali del download"""
+    totale_compiti = _load_catalog().TOTALE_COMPITI
     print("\n" + "=" * 60)
     print("📊 STATISTICHE FINALI")
     print("=" * 60)
     print(f"✅ Scaricati con successo: {success_count}")
     print(f"❌ Falliti: {len(failed_files)}")
-    print(f"📈 Percentuale successo: {(success_count/TOTALE_COMPITI)*100:.1f}%")
+    print(f"📈 Percentuale successo: {(success_count/totale_compiti)*100:.1f}%")
     
     if failed_files:
         print("\n❌ File falliti:")
@@ -104,24 +126,28 @@ def _print_folder_stats(folder_path):
     total_size_mb = total_size / (1024 * 1024)
     print(f"\n💾 Spazio totale occupato: {total_size_mb:.1f} MB")
 
-def download_all_compiti(folder_path="../pdfs", delay=1):
-    """Scarica tutti i compiti"""
-    print(f"🚀 Inizio download di {TOTALE_COMPITI} compiti...")
+def download_all_compiti(folder_path="../pdfs", delay=1, use_archive=False):
+    """Scarica tutti i compiti (nell'archivio pdfs/compiti.pak se use_archive)"""
+    catalog = _load_catalog()
+    totale_compiti = catalog.TOTALE_COMPITI
+    
+    print(f"🚀 Inizio download di {totale_compiti} compiti...")
     print(f"📁 Cartella di destinazione: {os.path.abspath(folder_path)}")
     print("=" * 60)
     
     create_download_folder(folder_path)
+    archive = PdfArchive(get_archive_path(folder_path)) if use_archive else None
     
     success_count = 0
     failed_files = []
     
-    for i, compito in enumerate(COMPITI_DICT, 1):
+    for i, compito in enumerate(catalog.COMPITI_DICT, 1):
         url = compito['url_completo']
         filename = get_filename_from_url(url)
         
-        print(f"\n[{i}/{TOTALE_COMPITI}] {compito['nome']}")
+        print(f"\n[{i}/{totale_compiti}] {compito['nome']}")
         
-        if download_file(url, filename, folder_path):
+        if download_file(url, filename, folder_path, archive=archive):
             success_count += 1
         else:
             failed_files.append({
@@ -130,13 +156,13 @@ def download_all_compiti(folder_path="../pdfs", delay=1):
                 'filename': filename
             })
         
-        if i < TOTALE_COMPITI:
+        if i < totale_compiti:
             time.sleep(delay)
     
     _print_download_stats(success_count, failed_files)
     _print_folder_stats(folder_path)
 
-def download_by_year(year, folder_path="../pdfs"):
+def download_by_year(year, folder_path="../pdfs", use_archive=False):
     """Scarica solo i compiti di un anno specifico"""
     from links_variable import get_compiti_by_year, get_url_by_nome
     
@@ -147,6 +173,7 @@ def download_by_year(year, folder_path="../pdfs"):
     
     print(f"📅 Scaricando {len(compiti_anno)} compiti dell'anno {year}...")
     create_download_folder(folder_path)
+    archive = PdfArchive(get_archive_path(folder_path)) if use_archive else None
     
     success_count = 0
     for i, nome_compito in enumerate(compiti_anno, 1):
@@ -155,7 +182,7 @@ def download_by_year(year, folder_path="../pdfs"):
         
         print(f"[{i}/{len(compiti_anno)}] {nome_compito}")
         
-        if download_file(url, filename, folder_path):
+        if download_file(url, filename, folder_path, archive=archive):
             success_count += 1
         
         time.sleep(1)  # Pausa tra i download
@@ -166,10 +193,14 @@ def main():
     """Funzione principale"""
     import sys
     
-    if len(sys.argv) > 1:
+    # --archivio: aggiungi i PDF a pdfs/compiti.pak invece di salvarli sciolti
+    args = [arg for arg in sys.argv[1:] if arg != "--archivio"]
+    use_archive = len(args) < len(sys.argv) - 1
+    
+    if args:
         # Scarica solo un anno specifico
-        year = sys.argv[1]
-        download_by_year(year)
+        year = args[0]
+        download_by_year(year, use_archive=use_archive)
     else:
         # Scarica tutto
         print("⚠️  ATTENZIONE: Stai per scaricare 136 file!")
@@ -178,7 +209,7 @@ def main():
         
         response = input("\n🤔 Vuoi continuare? (s/n): ").lower().strip()
         if response in ['s', 'si', 'sì', 'y', 'yes']:
-            download_all_compiti()
+            download_all_compiti(use_archive=use_archive)
         else:
             print("❌ Download annullato.")
 
@@ -4,11 +4,12 @@
 Script per estrarre tutti i link dal file data.html e generare variabili Python
 """
 
-from bs4 import BeautifulSoup
 import re
 
 def extract_links_from_html(html_file):
     """Estrae tutti i link dal file HTML"""
+    from bs4 import BeautifulSoup
+    
     with open(html_file, 'r', encoding='utf-8') as f:
         content = f.read()
     
@@ -2,10 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import os
-from PyPDF2 import PdfReader
+import sys
 from collections import Counter
 import re
 from pathlib import Path
+from pdf_archive import iter_pdf_sources
 
 def clean_question(question):
     """Rimuove le intestazioni, numeri e altri testi non pertinenti dalla domanda"""
@@ -35,66 +36,82 @@ def clean_question(question):
 def extract_questions_from_pages(pdf_path, pages=[2, 3]):  # pagine 3 e 4 (indice 2 e 3)
     """Estrae le domande dalle pagine specificate del PDF"""
     try:
-        reader = PdfReader(pdf_path)
-        text = ""
-        
-        for page_num in pages:
-            if page_num < len(reader.pages):
-                page_text = reader.pages[page_num].extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        
-        # Cerca domande che iniziano con numero e parentesi, es: "4)"
-        # Cattura tutto il testo fino alla prossima domanda numerata o fine riga
-        questions = []
-        lines = text.split('\n')
-        current_question = ""
-        
-        for line in lines:
-            line = line.strip()
-            # Se la riga inizia con numero), è una nuova domanda
-            if re.match(r'^\d+\)', line):
-                if current_question:
-                    # Pulisci la domanda dalle intestazioni
-                    cleaned_question = clean_question(current_question.strip())
-                    if cleaned_question:
-                        questions.append(cleaned_question)
-                current_question = line
-            elif current_question and line:
-                # Continua la domanda precedente se non è vuota
-                current_question += " " + line
-        
-        # Aggiungi l'ultima domanda se presente
-        if current_question:
-            cleaned_question = clean_question(current_question.strip())
-            if cleaned_question:
-                questions.append(cleaned_question)
-            
-        return questions
-        
+        return _extract_questions(pdf_path, pages)
     except Exception as e:
-        print(f"Errore nel leggere {pdf_path}: {e}")
+        print(f"Errore nel leggere {getattr(pdf_path, 'name', pdf_path)}: {e}")
         return []
 
-def _process_pdfs(pdf_folder):
-    """Processa tutti i PDF nella cartella e restituisce i dati"""
+def _extract_questions(pdf_path, pages=[2, 3]):
+    """Come extract_questions_from_pages, ma propaga gli errori di lettura"""
+    from PyPDF2 import PdfReader  # import pesante: solo quando serve davvero
+    
+    reader = PdfReader(pdf_path)
+    text = ""
+    
+    for page_num in pages:
+        if page_num < len(reader.pages):
+            page_text = reader.pages[page_num].extract_text()
+            if page_text:
+                text += page_text + "\n"
+    
+    # Cerca domande che iniziano con numero e parentesi, es: "4)"
+    # Cattura tutto il testo fino alla prossima domanda numerata o fine riga
+    questions = []
+    lines = text.split('\n')
+    current_question = ""
+    
+    for line in lines:
+        line = line.strip()
+        # Se la riga inizia con numero), è una nuova domanda
+        if re.match(r'^\d+\)', line):
+            if current_question:
+                # Pulisci la domanda dalle intestazioni
+                cleaned_question = clean_question(current_question.strip())
+                if cleaned_question:
+                    questions.append(cleaned_question)
+            current_question = line
+        elif current_question and line:
+            # Continua la domanda precedente se non è vuota
+            current_question += " " + line
+    
+    # Aggiungi l'ultima domanda se presente
+    if current_question:
+        cleaned_question = clean_question(current_question.strip())
+        if cleaned_question:
+            questions.append(cleaned_question)
+        
+    return questions
+
+def _process_pdfs(pdf_folder, retry_quarantined=False):
+    """Processa tutti i PDF nella cartella e restituisce i dati
+    
+    Ogni PDF è letto in un worker isolato con limiti di tempo e memoria;
+    i file che falliscono finiscono in quarantena e sono esclusi.
+    """
     question_counter = Counter()
     file_questions = {}
     total_questions = 0
     
     print("Analizzando i PDF...")
     
-    for filename in sorted(os.listdir(pdf_folder)):
-        if filename.endswith(".pdf"):
-            pdf_path = os.path.join(pdf_folder, filename)
-            print(f"Elaborando: {filename}")
-            
-            questions = extract_questions_from_pages(pdf_path)
-            file_questions[filename] = questions
-            total_questions += len(questions)
-            
-            for question in questions:
-                question_counter[question] += 1
+    from safe_extract import extract_safely
+    
+    # PDF sciolti e contenuti nell'archivio pdfs/compiti.pak (letti senza estrarli)
+    sources = iter_pdf_sources(pdf_folder)
+    signatures = {filename: firma for filename, _, firma in sources}
+    results, quarantined = extract_safely([(filename, source) for filename, source, _ in sources],
+                                          signatures, retry_quarantined)
+    
+    for filename in sorted(results):
+        questions = results[filename]
+        file_questions[filename] = questions
+        total_questions += len(questions)
+        
+        for question in questions:
+            question_counter[question] += 1
+    
+    if quarantined:
+        print(f"⚠️  {len(quarantined)} PDF esclusi perché in quarantena (dettagli in output/quarantena.json)")
     
     return question_counter, file_questions, total_questions
 
@@ -160,16 +177,48 @@ def _save_results(question_counter, file_questions, total_questions):
             if len(files_with_question) > 1:
                 f.write(f"    File: {', '.join(files_with_question)}\n")
 
+def _option_value(name, default=None):
+    """Valore dell'opzione --nome valore nella riga di comando"""
+    if name in sys.argv[:-1]:
+        return float(sys.argv[sys.argv.index(name) + 1])
+    return default
+
 def main():
-    """Funzione principale per l'analisi delle domande"""
+    """Funzione principale per l'analisi delle domande
+    
+    Con --riprova-quarantena rielabora anche i PDF in quarantena.
+    Con --approssimato [--frazione 0.2] [--tempo SECONDI] stima le frequenze
+    su un campione stratificato per anno invece di leggere tutti i PDF.
+    Con --streaming [--capacita N] [--top K] conta le domande a memoria
+    costante e mostra solo le più frequenti.
+    """
     pdf_folder = "../pdfs"
+    retry_quarantined = "--riprova-quarantena" in sys.argv
     
     if not os.path.exists(pdf_folder):
         print(f"Cartella {pdf_folder} non trovata!")
         return
     
+    if "--streaming" in sys.argv:
+        from heavy_hitters import print_top, save_sketch, stream_pdfs
+        from config import HEAVY_HITTERS_CAPACITY
+        capacity = int(_option_value("--capacita", HEAVY_HITTERS_CAPACITY))
+        sketch = stream_pdfs(pdf_folder, capacity, retry_quarantined)
+        print_top(sketch, int(_option_value("--top", 20)))
+        print(f"\n\nSketch salvato in '{save_sketch(sketch)}'")
+        return
+    
+    if "--approssimato" in sys.argv:
+        from approx_analysis import main as approx_main
+        from config import APPROX_FRACTION
+        approx_main(pdf_folder, _option_value("--frazione", APPROX_FRACTION), _option_value("--tempo"))
+        return
+    
     # Processa i PDF
-    question_counter, file_questions, total_questions = _process_pdfs(pdf_folder)
+    question_counter, file_questions, total_questions = _process_pdfs(pdf_folder, retry_quarantined)
+    if not file_questions:
+        print("Nessun PDF elaborato con successo.")
+        return
     
     # Stampa statistiche
     _print_statistics(question_counter, file_questions, total_questions)
@@ -200,6 +249,17 @@ def main():
     # Salva risultati
     _save_results(question_counter, file_questions, total_questions)
     print("\n\nRisultati salvati in '../output/analisi_domande.txt'")
+    
+    # Co-occorrenze e composizione dei compiti
+    from cooccurrence import save_cooccurrence_report
+    if save_cooccurrence_report(file_questions) is not None:
+        print("Co-occorrenze salvate in '../output/cooccorrenze.txt'")
+    
+    # Aggiorna le partizioni per anno
+    from question_partitions import write_partitions
+    written = write_partitions(file_questions, pdf_folder)
+    if written:
+        print(f"Partizioni aggiornate in '../output/partizioni/': {', '.join(sorted(written))}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ricerca veloce delle domande già uscite negli anni precedenti
+
+Le domande delle partizioni vengono trasformate in una matrice sparsa TF-IDF
+su n-grammi di caratteri (con hashing delle feature), salvata su disco in
+output/indice_similarita.*. Le domande di un nuovo compito sono confrontate
+con tutte quelle storiche con un unico prodotto matrice-sparsa.
+numpy e scipy vengono importati da main() dopo la lettura degli argomenti,
+così --help e gli errori sugli argomenti restano immediati.
+"""
+
+import argparse
+import json
+import re
+import zlib
+from pathlib import Path
+
+from config import SIMILARITY_INDEX, SIMILARITY_NGRAM_RANGE, SIMILARITY_THRESHOLD
+from question_partitions import UNKNOWN_YEAR, get_partitions_dir, list_years, load_partition, parse_exam_date
+
+PROJECT_ROOT = Path(__file__).parent.parent
+N_FEATURES = 2 ** 18
+
+np = sparse = None  # numpy e scipy.sparse, caricati da _load_numpy()
+
+def _load_numpy():
+    global np, sparse
+    import numpy
+    from scipy import sparse as scipy_sparse
+    np, sparse = numpy, scipy_sparse
+
+def normalize_text(text):
+    """Minuscole, senza punteggiatura e spazi multipli"""
+    text = re.sub(r'[^\w\s]', ' ', text.lower())
+    return " " + re.sub(r'\s+', ' ', text).strip() + " "
+
+def _ngram_hashes(text, ngram_range=SIMILARITY_NGRAM_RANGE):
+    text = normalize_text(text)
+    low, high = ngram_range
+    return [zlib.crc32(text[i:i + n].encode('utf-8')) % N_FEATURES
+            for n in range(low, high + 1)
+            for i in range(len(text) - n + 1)]
+
+def _term_matrix(questions):
+    """Matrice sparsa (domande x feature) con tf sublineare"""
+    rows, cols = [], []
+    for row, question in enumerate(questions):
+        hashes = _ngram_hashes(question)
+        rows.extend([row] * len(hashes))
+        cols.extend(hashes)
+    data = np.ones(len(cols), dtype=np.float32)
+    matrix = sparse.csr_matrix((data, (rows, cols)), shape=(len(questions), N_FEATURES))
+    matrix.sum_duplicates()
+    np.log1p(matrix.data, out=matrix.data)
+    matrix.data += 1
+    return matrix
+
+def _l2_normalize(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms).dot(matrix).tocsr()
+
+def _vectorize(questions, idf):
+    matrix = _term_matrix(questions)
+    matrix.data *= idf[matrix.indices]
+    return _l2_normalize(matrix)
+
+def _collect_history():
+    """Domande storiche con i compiti in cui sono uscite, dalle partizioni"""
+    history = {}
+    for year in list_years():
+        for filename, info in load_partition(year)["files"].items():
+            for question in info["domande"]:
+                history.setdefault(question, []).append(filename)
+    questions = sorted(history)
+    return questions, [sorted(history[q]) for q in questions]
+
+def _index_paths():
+    base = PROJECT_ROOT / SIMILARITY_INDEX
+    return base.with_suffix(".npz"), base.with_suffix(".idf.npy"), base.with_suffix(".json")
+
+def _partitions_signature():
+    """[nome, mtime] di ogni partizione: cambia anche quando una partizione viene rimossa"""
+    return [[p.name, p.stat().st_mtime_ns] for p in sorted(get_partitions_dir().glob("*.json"))]
+
+def build_index():
+    """Costruisce e salva l'indice TF-IDF a partire dalle partizioni"""
+    signature = _partitions_signature()
+    questions, files = _collect_history()
+    if not questions:
+        return None
+
+    counts = _term_matrix(questions)
+    document_frequency = np.bincount(counts.indices, minlength=N_FEATURES)
+    idf = (np.log((1 + len(questions)) / (1 + document_frequency)) + 1).astype(np.float32)
+    counts.data *= idf[counts.indices]
+    matrix = _l2_normalize(counts)
+
+    matrix_path, idf_path, meta_path = _index_paths()
+    matrix_path.parent.mkdir(parents=True, exist_ok=True)
+    sparse.save_npz(matrix_path, matrix)
+    np.save(idf_path, idf)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({"domande": questions, "file": files, "partizioni": signature}, f, ensure_ascii=False)
+
+    return {"matrice": matrix, "idf": idf, "domande": questions, "file": files}
+
+def load_index(rebuild=False):
+    """Carica l'indice salvato, ricostruendolo se le partizioni sono cambiate"""
+    matrix_path, idf_path, meta_path = _index_paths()
+    if rebuild or not meta_path.exists():
+        return build_index()
+
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    # Un indice di formato precedente non ha "partizioni" e viene ricostruito
+    if meta.get("partizioni") != _partitions_signature():
+        return build_index()
+    return {"matrice": sparse.load_npz(matrix_path), "idf": np.load(idf_path),
+            "domande": meta["domande"], "file": meta["file"]}
+
+def find_similar(questions, index, top=3, threshold=SIMILARITY_THRESHOLD, exclude=(), before=None):
+    """Per ogni domanda restituisce le domande storiche più simili
+
+    Il risultato è una lista (una voce per domanda) di liste di dizionari
+    con domanda, similarità, frequenza e anni di apparizione. I compiti in
+    exclude (di solito quelli interrogati, già presenti nelle partizioni)
+    non contano nella frequenza e negli anni; con before contano solo i
+    compiti degli anni precedenti.
+    """
+    if not questions:
+        return []
+
+    query = _vectorize(questions, index["idf"])
+    scores = query.dot(index["matrice"].T).toarray()
+
+    exclude = set(exclude)
+
+    def is_history(filename):
+        if filename in exclude:
+            return False
+        year, _ = parse_exam_date(filename)
+        return before is None or (year != UNKNOWN_YEAR and year < before)
+
+    # Le domande uscite solo in compiti esclusi o successivi non sono storiche: scartale
+    history_files = index["file"]
+    if exclude or before is not None:
+        history_files = [[f for f in files if is_history(f)] for files in index["file"]]
+        scores[:, [column for column, files in enumerate(history_files) if not files]] = -1
+
+    top = min(top, scores.shape[1])
+    candidates = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1)
+    candidates = np.take_along_axis(candidates, order, axis=1)
+
+    results = []
+    for row, columns in enumerate(candidates):
+        matches = []
+        for column in columns:
+            score = float(scores[row, column])
+            if score < threshold:
+                break
+            files = history_files[column]
+            matches.append({
+                "domanda": index["domande"][column],
+                "similarita": score,
+                "frequenza": len(files),
+                "anni": sorted({parse_exam_date(f)[0] for f in files}),
+            })
+        results.append(matches)
+    return results
+
+def main():
+    """Mostra, per ogni PDF indicato, quali domande sono già uscite in passato"""
+    parser = argparse.ArgumentParser(description="Cerca le domande già uscite negli anni precedenti")
+    parser.add_argument("pdf", nargs="+", help="PDF del compito da analizzare")
+    parser.add_argument("--top", type=int, default=3, help="Risultati per domanda (default 3)")
+    parser.add_argument("--soglia", type=float, default=SIMILARITY_THRESHOLD,
+                        help=f"Similarità minima (default {SIMILARITY_THRESHOLD})")
+    parser.add_argument("--ricostruisci", action="store_true", help="Ricostruisci l'indice")
+    args = parser.parse_args()
+    _load_numpy()
+
+    from extract_questions import extract_questions_from_pages
+
+    index = load_index(rebuild=args.ricostruisci)
+    if index is None:
+        print("Nessuna partizione disponibile: esegui prima l'analisi delle domande")
+        return
+    print(f"Indice caricato: {len(index['domande'])} domande storiche")
+
+    for pdf_path in args.pdf:
+        print("\n" + "=" * 60)
+        print(f"📄 {Path(pdf_path).name}")
+        print("=" * 60)
+
+        questions = extract_questions_from_pages(pdf_path)
+        year, _ = parse_exam_date(Path(pdf_path).name)
+        matches_per_question = find_similar(questions, index, args.top, args.soglia,
+                                            exclude={Path(pdf_path).name},
+                                            before=None if year == UNKNOWN_YEAR else year)
+        for question, matches in zip(questions, matches_per_question):
+            print(f"\n❓ {question}")
+            if not matches:
+                print("   ✨ Domanda nuova")
+            for match in matches:
+                print(f"   [{match['similarita']:.2f}] [{match['frequenza']}x] {match['domanda']}")
+                print(f"       Anni: {', '.join(match['anni'])}")
+
+if __name__ == "__main__":
+    main()
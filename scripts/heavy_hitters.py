@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Domande più frequenti a memoria costante (algoritmo Space-Saving)
+
+Tiene al massimo `capacity` domande con un contatore e un errore massimo:
+la frequenza reale di ogni domanda tracciata è compresa tra
+conteggio - errore e conteggio, e ogni domanda con frequenza maggiore di
+totale / capacity è sicuramente tracciata. Gli sketch di esecuzioni
+separate (es. corsi o archivi diversi) si possono unire e salvare in JSON.
+"""
+
+import heapq
+import json
+import sys
+from pathlib import Path
+
+from config import HEAVY_HITTERS_CAPACITY, HEAVY_HITTERS_SKETCH
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+class SpaceSaving:
+    """Sketch Space-Saving con heap per trovare subito il contatore minimo"""
+
+    def __init__(self, capacity=HEAVY_HITTERS_CAPACITY):
+        self.capacity = capacity
+        self.total = 0
+        self.counts = {}  # domanda -> [conteggio, errore]
+        self._heap = []  # (conteggio, domanda), con voci obsolete scartate in lettura
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _push(self, item):
+        heapq.heappush(self._heap, (self.counts[item][0], item))
+        # Le voci obsolete si accumulano: ricostruisci l'heap se cresce troppo
+        if len(self._heap) > 2 * self.capacity + 16:
+            self._heap = [(count, item) for item, (count, _) in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if item in self.counts and self.counts[item][0] == count:
+                return item
+
+    def min_count(self):
+        """Conteggio minimo tracciato (0 se lo sketch non è pieno)"""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(count for count, _ in self.counts.values())
+
+    def update(self, item, weight=1):
+        self.total += weight
+        if item in self.counts:
+            self.counts[item][0] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = [weight, 0]
+        else:
+            # Sostituisci la domanda con il conteggio minimo ereditandone il valore
+            evicted = self._pop_min()
+            floor = self.counts.pop(evicted)[0]
+            self.counts[item] = [floor + weight, floor]
+        self._push(item)
+
+    def merge(self, other):
+        """Unisce un altro sketch, restituendo un nuovo SpaceSaving"""
+        merged = SpaceSaving(max(self.capacity, other.capacity))
+        merged.total = self.total + other.total
+        floor_self, floor_other = self.min_count(), other.min_count()
+
+        combined = {}
+        for item in self.counts.keys() | other.counts.keys():
+            count_a, error_a = self.counts.get(item, [floor_self, floor_self])
+            count_b, error_b = other.counts.get(item, [floor_other, floor_other])
+            combined[item] = [count_a + count_b, error_a + error_b]
+
+        for item, value in heapq.nlargest(merged.capacity, combined.items(), key=lambda kv: kv[1][0]):
+            merged.counts[item] = value
+        merged._heap = [(count, item) for item, (count, _) in merged.counts.items()]
+        heapq.heapify(merged._heap)
+        return merged
+
+    def top(self, k=20):
+        """Restituisce [(domanda, conteggio, errore, garantita)] ordinati per conteggio
+
+        garantita indica che la domanda è sicuramente tra le k più frequenti.
+        """
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1][0], reverse=True)
+        threshold = ranked[k][1][0] if len(ranked) > k else self.min_count()
+        return [(item, count, error, count - error >= threshold)
+                for item, (count, error) in ranked[:k]]
+
+    def to_dict(self):
+        return {"capacita": self.capacity, "totale": self.total,
+                "conteggi": {item: value for item, value in self.counts.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["capacita"])
+        sketch.total = data["totale"]
+        sketch.counts = {item: list(value) for item, value in data["conteggi"].items()}
+        sketch._heap = [(count, item) for item, (count, _) in sketch.counts.items()]
+        heapq.heapify(sketch._heap)
+        return sketch
+
+def save_sketch(sketch, path=None):
+    path = Path(path) if path else PROJECT_ROOT / HEAVY_HITTERS_SKETCH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(sketch.to_dict(), f, ensure_ascii=False)
+    return path
+
+def load_sketch(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return SpaceSaving.from_dict(json.load(f))
+
+def print_top(sketch, k=20):
+    """Stampa le domande più frequenti con i limiti di errore"""
+    print("\n" + "="*80)
+    print(f"TOP {k} DOMANDE (STREAMING, {sketch.capacity} contatori)")
+    print("="*80)
+    print(f"Totale domande elaborate: {sketch.total}")
+    print(f"Errore massimo per domanda: {sketch.min_count()} (≤ totale/capacità = {sketch.total / sketch.capacity:.1f})")
+    for item, count, error, guaranteed in sketch.top(k):
+        mark = "" if guaranteed else " (?)"
+        print(f"\n[{count - error}-{count}x]{mark} {item}")
+
+def stream_pdfs(pdf_folder, capacity=HEAVY_HITTERS_CAPACITY, retry_quarantined=False):
+    """Elabora i PDF uno alla volta aggiornando solo lo sketch"""
+    from pdf_archive import iter_pdf_sources
+    from safe_extract import extract_stream
+
+    sources = iter_pdf_sources(pdf_folder)
+    signatures = {filename: firma for filename, _, firma in sources}
+    sketch = SpaceSaving(capacity)
+    for _, questions, _ in extract_stream([(f, s) for f, s, _ in sources], signatures, retry_quarantined):
+        for question in questions or []:
+            sketch.update(question)
+    return sketch
+
+def main():
+    """Uso: python heavy_hitters.py [unisci sketch1.json sketch2.json ...] [--top K]"""
+    args = sys.argv[1:]
+    k = 20
+    if "--top" in args[:-1]:
+        k = int(args[args.index("--top") + 1])
+        del args[args.index("--top"):args.index("--top") + 2]
+
+    if args and args[0] == "unisci":
+        sketches = [load_sketch(path) for path in args[1:]]
+        if not sketches:
+            print("❌ Indica almeno uno sketch da unire")
+            return
+        merged = sketches[0]
+        for sketch in sketches[1:]:
+            merged = merged.merge(sketch)
+        print(f"🔗 Uniti {len(sketches)} sketch in '{save_sketch(merged)}'")
+        print_top(merged, k)
+    else:
+        path = PROJECT_ROOT / HEAVY_HITTERS_SKETCH
+        if not path.exists():
+            print("Nessuno sketch: esegui 'python extract_questions.py --streaming'")
+            return
+        print_top(load_sketch(path), k)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Controlla il tempo di import degli script con python -X importtime
+
+Ogni script viene importato in un interprete pulito; se il tempo cumulato
+supera IMPORT_TIME_BUDGET_MS viene segnalato insieme ai moduli più lenti,
+così una dipendenza pesante importata a livello di modulo si nota subito.
+Gli script costruiti attorno a numpy/scipy o asyncio hanno un budget
+separato (IMPORT_TIME_BUDGET_HEAVY_MS). Esce con codice 1 se almeno uno
+script supera il proprio budget.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+from config import IMPORT_TIME_BUDGET_MS, IMPORT_TIME_BUDGET_HEAVY_MS
+
+SCRIPT_DIR = Path(__file__).parent
+
+# Script che devono partire velocemente (menu e comandi brevi)
+ENTRY_POINTS = [
+    "main",
+    "extract_links",
+    "download_compiti",
+    "extract_questions",
+    "question_partitions",
+    "watch_pdfs",
+    "pdf_archive",
+    "safe_extract",
+    "heavy_hitters",
+    "find_similar",
+    "import_budget",
+]
+
+# Script che importano numpy/scipy o asyncio a livello di modulo
+HEAVY_ENTRY_POINTS = [
+    "cooccurrence",
+    "approx_analysis",
+    "stats_server",
+]
+
+def measure_import(module):
+    """Restituisce (totale in ms, [(ms cumulati, modulo)] importati direttamente) per un modulo"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=SCRIPT_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    timings = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name[1:].rstrip()
+        timings.append((int(cumulative) / 1000, len(name) - len(name.lstrip()), name.strip()))
+
+    # I figli di un modulo compaiono prima della sua riga, con indentazione 2
+    total, children = 0.0, []
+    for position, (ms, indent, name) in enumerate(timings):
+        if indent == 0 and name == module:
+            total = ms
+            for child_ms, child_indent, child_name in reversed(timings[:position]):
+                if child_indent == 0:
+                    break
+                if child_indent == 2:
+                    children.append((child_ms, child_name))
+    return total, sorted(children, reverse=True)
+
+def main():
+    """Misura tutti gli script e stampa il confronto con il budget
+
+    Uso: python import_budget.py [budget ms] [budget ms script pesanti]
+    """
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else IMPORT_TIME_BUDGET_MS
+    heavy_budget = float(sys.argv[2]) if len(sys.argv) > 2 else IMPORT_TIME_BUDGET_HEAVY_MS
+    over_budget = []
+
+    print(f"⏱️  Budget di import: {budget:.0f} ms ({heavy_budget:.0f} ms per numpy/scipy e asyncio)")
+    print("-" * 50)
+    checks = [(m, budget) for m in ENTRY_POINTS] + [(m, heavy_budget) for m in HEAVY_ENTRY_POINTS]
+    for module, limit in checks:
+        try:
+            total, timings = measure_import(module)
+        except RuntimeError as e:
+            print(f"❌ {module}: import fallito ({e})")
+            over_budget.append(module)
+            continue
+
+        status = "✅" if total <= limit else "❌"
+        print(f"{status} {module}: {total:.1f} ms")
+        if total > limit:
+            over_budget.append(module)
+            # Moduli più lenti importati direttamente dallo script
+            for ms, name in timings[:3]:
+                print(f"      {name}: {ms:.1f} ms")
+
+    if over_budget:
+        print(f"\n⚠️  Fuori budget: {', '.join(over_budget)}")
+        sys.exit(1)
+    print("\n🎉 Tutti gli script sono nel budget")
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,7 @@ def print_menu():
     print("4. 🚀 Esegui tutto (pipeline completa)")
     print("5. 📊 Mostra statistiche esistenti")
     print("6. 🧹 Pulisci file temporanei")
+    print("7. 👀 Modalità watch (analizza i nuovi PDF)")
     print("0. ❌ Esci")
     print("-"*40)
 
@@ -118,7 +119,8 @@ def run_analysis():
     print("\n🔍 Analisi domande in corso...")
     
     # Controlla se ci sono PDF
-    pdf_count = len(list(Path("pdfs").glob("*.pdf"))) if Path("pdfs").exists() else 0
+    from pdf_archive import count_pdfs
+    pdf_count = count_pdfs("pdfs")
     if pdf_count == 0:
         print("⚠️  Nessun PDF trovato nella cartella pdfs/")
         print("   Prima esegui il download dei compiti (opzione 2)")
@@ -141,6 +143,23 @@ def run_analysis():
         print(f"❌ Errore nell'analisi: {e}")
         return False
 
+def run_watch():
+    """Avvia la modalità watch sulla cartella pdfs/"""
+    print("\n👀 Modalità watch...")
+    original_cwd = os.getcwd()
+    try:
+        os.chdir(Path(__file__).parent.parent)
+        
+        from watch_pdfs import watch
+        watch("pdfs")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Errore nella modalità watch: {e}")
+        return False
+    finally:
+        os.chdir(original_cwd)
+
 def run_full_pipeline():
     """Esegue la pipeline completa"""
     print("\n🚀 PIPELINE COMPLETA")
@@ -198,7 +217,8 @@ def show_statistics():
             print(f"❌ {name}: Non ancora generato")
     
     # Conta PDF
-    pdf_count = len(list(Path("pdfs").glob("*.pdf"))) if Path("pdfs").exists() else 0
+    from pdf_archive import count_pdfs
+    pdf_count = count_pdfs("pdfs")
     print(f"📁 PDF scaricati: {pdf_count}")
     
     # Mostra sommario se disponibile
@@ -255,7 +275,7 @@ def main():
     
     while True:
         print_menu()
-        choice = input("👉 Scegli un'opzione (0-6): ").strip()
+        choice = input("👉 Scegli un'opzione (0-7): ").strip()
         
         try:
             if choice == "0":
@@ -273,8 +293,10 @@ def main():
                 show_statistics()
             elif choice == "6":
                 clean_temp_files()
+            elif choice == "7":
+                run_watch()
             else:
-                print("❌ Opzione non valida. Scegli un numero da 0 a 6.")
+                print("❌ Opzione non valida. Scegli un numero da 0 a 7.")
                 
         except KeyboardInterrupt:
             print("\n\n👋 Interrotto dall'utente. Arrivederci!")
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Archivio unico dei PDF con indice e accesso diretto ai singoli file
+
+Formato del file (pdfs/compiti.pak):
+    intestazione (32 byte): MAGIC, offset e lunghezza dell'indice
+    contenuto dei PDF, uno dopo l'altro
+    indice JSON: nome, offset, lunghezza e sha256 di ogni PDF
+
+I nuovi PDF vengono scritti al posto dell'indice in coda, seguiti dal nuovo
+indice: prima l'indice precedente viene copiato oltre la fine e
+l'intestazione punta alla copia, così un'interruzione lascia sempre un
+indice valido e il file non accumula indici obsoleti. I PDF sostituiti
+restano come byte inutilizzati finché l'archivio non viene compattato.
+La lettura usa mmap: ogni PDF è una fetta del file mappato, senza
+estrarlo su disco.
+"""
+
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+
+from config import PDF_ARCHIVE_NAME
+
+MAGIC = b"DAPAK\x00\x01\x00"
+HEADER = struct.Struct("<8sQQQ")  # magic, offset indice, lunghezza indice, numero file
+
+class MemberStream(io.RawIOBase):
+    """Stream in sola lettura su una fetta del file mappato (senza copiarla)
+
+    L'archivio viene mappato solo alla prima lettura, così i worker creati
+    con fork prima di allora non ereditano la mappatura.
+    """
+
+    def __init__(self, archive, member):
+        super().__init__()
+        self.name = f"{archive.path.name}:{member}"
+        self.archive_path = str(archive.path)
+        self.member = member
+        self._archive = archive
+        self._length = archive.index[member]["lunghezza"]
+        self._mapped_view = None
+        self._pos = 0
+
+    @property
+    def _view(self):
+        if self._mapped_view is None:
+            self._mapped_view = self._archive.view(self.member)
+        return self._mapped_view
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._length
+        self._pos = max(0, offset)
+        return self._pos
+
+    def read(self, size=-1):
+        end = self._length if size is None or size < 0 else min(self._pos + size, self._length)
+        data = bytes(self._view[self._pos:end])
+        self._pos = max(self._pos, end)
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+class PdfArchive:
+    """Archivio di PDF aperto in lettura (mmap) e in aggiunta"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.index = {}
+        self._mmap = None
+        if self.path.exists():
+            self._load_index()
+
+    def _load_index(self):
+        with open(self.path, 'rb') as f:
+            magic, offset, length, _ = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} non è un archivio di compiti valido")
+            f.seek(offset)
+            entries = json.loads(f.read(length).decode('utf-8')) if length else []
+        self.index = {entry["nome"]: entry for entry in entries}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Ci sono ancora fette in uso: la mappa verrà chiusa dal GC
+                pass
+            self._mmap = None
+
+    def names(self):
+        return sorted(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def _mapped(self):
+        if self._mmap is None:
+            with open(self.path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def view(self, name):
+        """Restituisce il contenuto di un PDF come memoryview sul file mappato"""
+        entry = self.index[name]
+        return memoryview(self._mapped())[entry["offset"]:entry["offset"] + entry["lunghezza"]]
+
+    def open_member(self, name):
+        """Restituisce uno stream leggibile da PdfReader per un PDF dell'archivio"""
+        return MemberStream(self, name)
+
+    def read(self, name):
+        """Legge il contenuto di un PDF con seek e read, senza mappare l'archivio"""
+        entry = self.index[name]
+        with open(self.path, 'rb') as f:
+            f.seek(entry["offset"])
+            return f.read(entry["lunghezza"])
+
+    def verify(self, name):
+        """Controlla lo sha256 di un PDF dell'archivio"""
+        return hashlib.sha256(self.view(name)).hexdigest() == self.index[name]["sha256"]
+
+    def _write_header(self, f, offset, length, count):
+        f.flush()
+        os.fsync(f.fileno())
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, offset, length, count))
+        f.flush()
+        os.fsync(f.fileno())
+
+    def append(self, files):
+        """Aggiunge {nome: bytes} all'archivio (un nome già presente viene sostituito)"""
+        # La mappa in lettura va chiusa prima di modificare il file
+        self.close()
+        if not self.path.exists():
+            with open(self.path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, HEADER.size, 0, 0))
+
+        with open(self.path, 'r+b') as f:
+            _, old_offset, old_length, old_count = HEADER.unpack(f.read(HEADER.size))
+            old_offset = max(old_offset, HEADER.size)
+            f.seek(old_offset)
+            old_index = f.read(old_length)
+            end = f.seek(0, io.SEEK_END)
+
+            # I nuovi PDF prendono il posto dell'indice attuale
+            index = dict(self.index)
+            offset = old_offset
+            for name, data in files.items():
+                index[name] = {"nome": name, "offset": offset, "lunghezza": len(data),
+                               "sha256": hashlib.sha256(data).hexdigest()}
+                offset += len(data)
+            index_data = json.dumps(sorted(index.values(), key=lambda e: e["nome"]),
+                                    ensure_ascii=False).encode('utf-8')
+            new_end = offset + len(index_data)
+
+            # 1. copia dell'indice attuale oltre la zona da scrivere
+            backup_offset = max(end, new_end)
+            f.seek(backup_offset)
+            f.write(old_index)
+            self._write_header(f, backup_offset, old_length, old_count)
+
+            # 2. nuovi PDF e nuovo indice al posto di quello vecchio
+            f.seek(old_offset)
+            for data in files.values():
+                f.write(data)
+            f.write(index_data)
+            self._write_header(f, offset, len(index_data), len(index))
+
+            # 3. via la copia dell'indice precedente
+            f.truncate(new_end)
+
+        self.index = index
+
+    def dead_bytes(self):
+        """Byte non più referenziati dall'indice (PDF sostituiti)"""
+        size = self.path.stat().st_size
+        with open(self.path, 'rb') as f:
+            _, _, index_length, _ = HEADER.unpack(f.read(HEADER.size))
+        live = sum(entry["lunghezza"] for entry in self.index.values())
+        return size - HEADER.size - index_length - live
+
+    def compact(self):
+        """Riscrive l'archivio con i soli PDF dell'indice. Restituisce i byte recuperati"""
+        before = self.path.stat().st_size
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        index = {}
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, HEADER.size, 0, 0))
+            for name in self.names():
+                entry = dict(self.index[name], offset=f.tell())
+                f.write(self.view(name))
+                index[name] = entry
+            index_data = json.dumps(list(index.values()), ensure_ascii=False).encode('utf-8')
+            index_offset = f.tell()
+            f.write(index_data)
+            self._write_header(f, index_offset, len(index_data), len(index))
+
+        self.close()
+        os.replace(tmp_path, self.path)
+        self.index = index
+        return before - self.path.stat().st_size
+
+def get_archive_path(pdf_folder):
+    """Percorso dell'archivio nella cartella dei PDF"""
+    return Path(pdf_folder) / PDF_ARCHIVE_NAME
+
+def open_archive(pdf_folder):
+    """Apre l'archivio della cartella, se esiste (altrimenti None)"""
+    path = get_archive_path(pdf_folder)
+    return PdfArchive(path) if path.exists() else None
+
+def iter_pdf_sources(pdf_folder):
+    """Restituisce (filename, sorgente, firma) per ogni PDF, sciolto o nell'archivio
+
+    La sorgente è il percorso del file oppure uno stream sul contenuto
+    nell'archivio; la firma serve a capire se il PDF è cambiato. Un PDF
+    sciolto ha la precedenza su quello con lo stesso nome nell'archivio.
+    """
+    sources = {}
+    archive = open_archive(pdf_folder)
+    if archive is not None:
+        for name, entry in archive.index.items():
+            if not name.endswith(".pdf"):
+                continue
+            sources[name] = (name, archive.open_member(name), entry["sha256"])
+
+    for entry in os.scandir(pdf_folder):
+        if entry.name.endswith(".pdf") and entry.is_file():
+            stat = entry.stat()
+            sources[entry.name] = (entry.name, entry.path, [int(stat.st_mtime), stat.st_size])
+
+    return [sources[name] for name in sorted(sources)]
+
+def count_pdfs(pdf_folder):
+    """Numero di PDF disponibili, sciolti o nell'archivio"""
+    if not os.path.exists(pdf_folder):
+        return 0
+    loose = {f for f in os.listdir(pdf_folder) if f.endswith(".pdf")}
+    archive = open_archive(pdf_folder)
+    if archive is not None:
+        loose.update(name for name in archive.names() if name.endswith(".pdf"))
+    return len(loose)
+
+def pack_folder(pdf_folder):
+    """Aggiunge all'archivio i PDF sciolti della cartella non ancora presenti"""
+    archive = PdfArchive(get_archive_path(pdf_folder))
+    files = {}
+    for filename in sorted(os.listdir(pdf_folder)):
+        if filename.endswith(".pdf") and filename not in archive:
+            with open(os.path.join(pdf_folder, filename), 'rb') as f:
+                files[filename] = f.read()
+    if files:
+        archive.append(files)
+    return archive, len(files)
+
+def main():
+    """Uso: python pdf_archive.py [crea|lista|verifica|estrai|compatta] [cartella]"""
+    command = sys.argv[1] if len(sys.argv) > 1 else "lista"
+    pdf_folder = sys.argv[2] if len(sys.argv) > 2 else "../pdfs"
+
+    if command == "crea":
+        archive, added = pack_folder(pdf_folder)
+        print(f"📦 Aggiunti {added} PDF a {archive.path} ({len(archive)} totali)")
+        return
+
+    archive = open_archive(pdf_folder)
+    if archive is None:
+        print(f"❌ Nessun archivio in {pdf_folder}: crealo con 'python pdf_archive.py crea'")
+        return
+
+    with archive:
+        if command == "lista":
+            for name in archive.names():
+                print(f"{name} ({archive.index[name]['lunghezza']} bytes)")
+            print(f"\n📦 {len(archive)} PDF in {archive.path}")
+            dead = archive.dead_bytes()
+            if dead:
+                print(f"🗑️  {dead} bytes inutilizzati: recuperali con 'python pdf_archive.py compatta'")
+        elif command == "verifica":
+            damaged = [name for name in archive.names() if not archive.verify(name)]
+            print(f"✅ {len(archive) - len(damaged)} PDF integri")
+            for name in damaged:
+                print(f"❌ Corrotto: {name}")
+        elif command == "estrai":
+            for name in archive.names():
+                with open(os.path.join(pdf_folder, name), 'wb') as f:
+                    f.write(archive.view(name))
+            print(f"📤 Estratti {len(archive)} PDF in {pdf_folder}")
+        elif command == "compatta":
+            saved = archive.compact()
+            print(f"🗜️  Archivio compattato: recuperati {saved} bytes ({len(archive)} PDF)")
+        else:
+            print(f"❌ Comando non valido: {command}")
+
+if __name__ == "__main__":
+    main()
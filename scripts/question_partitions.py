@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Aggregati delle domande partizionati per anno (e sessione)
+
+Ogni anno ha il proprio file JSON in output/partizioni/ con le domande di
+ogni compito e i conteggi per anno e per sessione. Le interrogazioni
+(frequenze su un intervallo di anni, domande nuove) uniscono le partizioni
+senza rileggere i PDF; un nuovo anno aggiorna solo la propria partizione.
+"""
+
+import json
+import os
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+from config import PARTITIONS_DIR
+from pdf_archive import iter_pdf_sources
+
+PROJECT_ROOT = Path(__file__).parent.parent
+FILENAME_PATTERN = re.compile(r'(\d{4})_(\d{2})_(\d{2})')
+UNKNOWN_YEAR = "sconosciuto"
+
+# Sessioni d'esame ricavate dal mese nel nome del file
+SESSIONI = {
+    "01": "invernale", "02": "invernale",
+    "06": "estiva", "07": "estiva",
+    "09": "autunnale",
+}
+
+def parse_exam_date(filename):
+    """Restituisce (anno, sessione) ricavati dal nome del file, es. 2024_06_12_Compito.pdf"""
+    match = FILENAME_PATTERN.search(filename)
+    if not match:
+        return UNKNOWN_YEAR, None
+    year, month, _ = match.groups()
+    return year, SESSIONI.get(month, "straordinaria")
+
+def get_partitions_dir():
+    """Restituisce la cartella delle partizioni, creandola se non esiste"""
+    partitions_dir = PROJECT_ROOT / PARTITIONS_DIR
+    partitions_dir.mkdir(parents=True, exist_ok=True)
+    return partitions_dir
+
+def _partition_path(year):
+    return get_partitions_dir() / f"{year}.json"
+
+def build_partition(year, files):
+    """Costruisce una partizione a partire da {filename: {"firma": ..., "domande": [...]}}"""
+    conteggi = Counter()
+    sessioni = {}
+    for filename, info in sorted(files.items()):
+        _, sessione = parse_exam_date(filename)
+        info["sessione"] = sessione
+        conteggi.update(info["domande"])
+        if sessione:
+            sessioni.setdefault(sessione, Counter()).update(info["domande"])
+    return {
+        "anno": year,
+        "files": dict(sorted(files.items())),
+        "conteggi": dict(conteggi.most_common()),
+        "sessioni": {s: dict(c.most_common()) for s, c in sorted(sessioni.items())},
+    }
+
+def load_partition(year):
+    """Carica la partizione di un anno (None se non esiste)"""
+    path = _partition_path(year)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_partition(partition):
+    """Salva una partizione solo se il contenuto è cambiato. Restituisce True se scritta"""
+    path = _partition_path(partition["anno"])
+    if load_partition(partition["anno"]) == partition:
+        return False
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(partition, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+    return True
+
+def remove_partition(year):
+    """Elimina la partizione di un anno. Restituisce True se esisteva"""
+    path = _partition_path(year)
+    if not path.exists():
+        return False
+    path.unlink(missing_ok=True)
+    return True
+
+def list_years():
+    """Restituisce gli anni per cui esiste una partizione"""
+    return sorted(p.stem for p in get_partitions_dir().glob("*.json"))
+
+def _group_by_year(filenames):
+    groups = {}
+    for filename in filenames:
+        year, _ = parse_exam_date(filename)
+        groups.setdefault(year, []).append(filename)
+    return groups
+
+def write_partitions(file_questions, pdf_folder):
+    """Scrive le partizioni a partire dal risultato di _process_pdfs
+
+    Le partizioni degli anni senza più PDF elaborati (eliminati o in
+    quarantena) vengono rimosse.
+    """
+    signatures = {name: firma for name, _, firma in iter_pdf_sources(pdf_folder)}
+    groups = _group_by_year(file_questions)
+    written = []
+    for year, filenames in groups.items():
+        files = {}
+        for filename in filenames:
+            files[filename] = {"firma": signatures.get(filename), "domande": file_questions[filename]}
+        if save_partition(build_partition(year, files)):
+            written.append(year)
+    for year in list_years():
+        if year not in groups and remove_partition(year):
+            written.append(year)
+    return sorted(written)
+
+def update_partitions(pdf_folder, extract=None, retry_quarantined=False):
+    """Aggiorna in modo incrementale le partizioni: rilegge solo i PDF nuovi o modificati
+
+    Senza una funzione extract i PDF sono letti in worker isolati (vedi
+    safe_extract) e quelli in quarantena restano fuori dalle partizioni.
+    Restituisce la lista degli anni la cui partizione è stata riscritta.
+    """
+    sources = {filename: (source, firma) for filename, source, firma in iter_pdf_sources(pdf_folder)}
+    groups = _group_by_year(sources)
+    partitions = {year: (load_partition(year) or {}).get("files", {})
+                  for year in sorted(set(groups) | set(list_years()))}
+
+    # Solo i PDF nuovi o con firma diversa vanno riletti
+    changed = []
+    for year, old_files in partitions.items():
+        for filename in groups.get(year, []):
+            old = old_files.get(filename)
+            if not old or old.get("firma") != sources[filename][1]:
+                changed.append(filename)
+
+    if extract is None:
+        from safe_extract import extract_safely
+        extracted, _ = extract_safely([(f, sources[f][0]) for f in changed],
+                                      {f: sources[f][1] for f in changed}, retry_quarantined)
+    else:
+        extracted = {}
+        for filename in changed:
+            print(f"Elaborando: {filename}")
+            extracted[filename] = extract(sources[filename][0])
+
+    written = []
+    for year, old_files in partitions.items():
+        files = {}
+        for filename in groups.get(year, []):
+            firma = sources[filename][1]
+            if filename in extracted:
+                files[filename] = {"firma": firma, "domande": extracted[filename]}
+            elif filename not in changed:
+                files[filename] = {"firma": firma, "domande": old_files[filename]["domande"]}
+
+        if not files:
+            # Nessun PDF rimasto per l'anno: rimuovi la partizione, se c'era
+            if remove_partition(year):
+                written.append(year)
+        elif save_partition(build_partition(year, files)):
+            written.append(year)
+
+    return written
+
+def _select_years(start=None, end=None):
+    return [y for y in list_years()
+            if y != UNKNOWN_YEAR
+            and (start is None or y >= str(start))
+            and (end is None or y <= str(end))]
+
+def merge_counts(start=None, end=None, sessione=None):
+    """Frequenza di ogni domanda negli anni [start, end], eventualmente per una sola sessione"""
+    total = Counter()
+    for year in _select_years(start, end):
+        partition = load_partition(year)
+        if sessione:
+            total.update(partition["sessioni"].get(sessione, {}))
+        else:
+            total.update(partition["conteggi"])
+    return total
+
+def merge_file_questions(start=None, end=None):
+    """Ricostruisce {filename: [domande]} unendo le partizioni"""
+    file_questions = {}
+    years = list_years() if start is None and end is None else _select_years(start, end)
+    for year in years:
+        for filename, info in load_partition(year)["files"].items():
+            file_questions[filename] = info["domande"]
+    return dict(sorted(file_questions.items()))
+
+def new_questions(year):
+    """Domande comparse nell'anno indicato e mai negli anni precedenti"""
+    year = str(year)
+    current = load_partition(year)
+    if current is None:
+        return Counter()
+    previous = set()
+    for other in _select_years(end=year):
+        if other != year:
+            previous.update(load_partition(other)["conteggi"])
+    return Counter({q: c for q, c in current["conteggi"].items() if q not in previous})
+
+def main():
+    """Aggiorna le partizioni e mostra le frequenze su un intervallo di anni
+
+    Uso: python question_partitions.py [anno_inizio [anno_fine]]
+    """
+    pdf_folder = "../pdfs"
+
+    if os.path.exists(pdf_folder):
+        written = update_partitions(pdf_folder)
+        if written:
+            print(f"Partizioni aggiornate: {', '.join(written)}")
+        else:
+            print("Partizioni già aggiornate")
+
+    years = _select_years()
+    if not years:
+        print("Nessuna partizione disponibile")
+        return
+
+    start = sys.argv[1] if len(sys.argv) > 1 else years[0]
+    end = sys.argv[2] if len(sys.argv) > 2 else (start if len(sys.argv) > 1 else years[-1])
+
+    print(f"\nFREQUENZA DOMANDE {start}-{end}:")
+    print("-" * 60)
+    for question, count in merge_counts(start, end).most_common(20):
+        print(f"[{count}x] {question}")
+
+    print(f"\nDOMANDE NUOVE NEL {end}:")
+    print("-" * 60)
+    nuove = new_questions(end)
+    if nuove:
+        for question, count in nuove.most_common():
+            print(f"[{count}x] {question}")
+    else:
+        print("Nessuna domanda nuova.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Estrazione delle domande in processi isolati con limiti di tempo e memoria
+
+Ogni PDF viene letto in un processo separato con un timeout e un limite di
+memoria: un file patologico viene terminato senza bloccare il resto
+dell'analisi e finisce in quarantena (output/quarantena.json) con motivo e
+durata. Le analisi successive saltano i file in quarantena, a meno che non
+siano cambiati o che venga chiesto di riprovarli. Un worker che fallisce
+prima di leggere il PDF (es. memoria non disponibile) non dice nulla sul
+file, che non finisce in quarantena e viene riprovato alla prossima analisi.
+"""
+
+import errno
+import io
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from config import EXTRACTION_MEMORY_MB, EXTRACTION_TIMEOUT, EXTRACTION_WORKERS, QUARANTINE_FILE
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+try:
+    import resource
+except ImportError:  # Windows: niente limite di memoria
+    resource = None
+
+def _quarantine_path():
+    return PROJECT_ROOT / QUARANTINE_FILE
+
+def load_quarantine():
+    """Restituisce {filename: {"motivo", "durata", "data", "firma"}}"""
+    path = _quarantine_path()
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_quarantine(quarantine):
+    path = _quarantine_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(quarantine.items())), f, ensure_ascii=False, indent=1)
+
+def _describe(source):
+    """Descrizione della sorgente passabile al worker (percorso o membro dell'archivio)"""
+    if isinstance(source, (str, os.PathLike)):
+        return ("file", str(source))
+    return ("archivio", source.archive_path, source.member)
+
+def _open(description):
+    if description[0] == "file":
+        return description[1]
+    from pdf_archive import PdfArchive
+    _, archive_path, member = description
+    # Solo i byte del PDF, senza mappare l'intero archivio nel worker
+    return io.BytesIO(PdfArchive(archive_path).read(member))
+
+def _worker(conn, description, memory_mb):
+    """Processo figlio: applica il limite di memoria ed estrae le domande"""
+    try:
+        try:
+            if resource is not None and memory_mb:
+                # RLIMIT_DATA conta la memoria allocata, non le librerie e i
+                # file mappati ereditati dal processo principale
+                limit = memory_mb * 1024 * 1024
+                resource.setrlimit(getattr(resource, "RLIMIT_DATA", resource.RLIMIT_AS), (limit, limit))
+            from extract_questions import _extract_questions
+            source = _open(description)
+        except (MemoryError, OSError) as e:
+            conn.send(("riprova", f"avvio del worker fallito: {type(e).__name__}: {e}"))
+            return
+
+        try:
+            conn.send(("ok", _extract_questions(source)))
+        except Exception as e:
+            if isinstance(e, MemoryError) or getattr(e, "errno", None) == errno.ENOMEM:
+                conn.send(("errore", f"memoria esaurita (limite {memory_mb} MB)"))
+            else:
+                conn.send(("errore", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+def _context():
+    # fork evita di reimportare PyPDF2 in ogni worker dove disponibile
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+
+def extract_many(sources, timeout=EXTRACTION_TIMEOUT, memory_mb=EXTRACTION_MEMORY_MB,
+                 workers=EXTRACTION_WORKERS, deadline=None):
+    """Estrae le domande da [(filename, sorgente)] in worker isolati
+
+    Genera (filename, domande, errore, durata, riprovabile): domande è None
+    e errore contiene il motivo se il worker è fallito, è andato in timeout
+    o ha superato il limite di memoria; riprovabile indica un fallimento
+    che non dipende dal file (es. worker senza memoria all'avvio).
+    Superato deadline (time.time()) i worker in corso vengono terminati e i
+    file rimasti sono restituiti come riprovabili.
+    """
+    ctx = _context()
+    pending = list(sources)
+    running = {}  # filename -> (processo, connessione, inizio)
+
+    while pending or running:
+        if deadline is not None and time.time() > deadline:
+            for filename, (process, conn, start) in running.items():
+                process.kill()
+                process.join()
+                conn.close()
+                yield filename, None, "tempo a disposizione esaurito", time.time() - start, True
+            for filename, _ in pending:
+                yield filename, None, "tempo a disposizione esaurito", 0.0, True
+            return
+
+        while pending and len(running) < max(1, workers):
+            filename, source = pending.pop(0)
+            parent_conn, child_conn = ctx.Pipe(duplex=False)
+            process = ctx.Process(target=_worker, args=(child_conn, _describe(source), memory_mb), daemon=True)
+            process.start()
+            child_conn.close()
+            running[filename] = (process, parent_conn, time.time())
+
+        multiprocessing.connection.wait([conn for _, conn, _ in running.values()], timeout=0.1)
+
+        for filename, (process, conn, start) in list(running.items()):
+            elapsed = time.time() - start
+            result = None
+            if conn.poll():
+                try:
+                    result = conn.recv()
+                except EOFError:
+                    # Il worker è morto senza rispondere (es. ucciso dal sistema)
+                    process.join()
+                    result = ("errore", f"worker terminato (codice {process.exitcode})")
+            elif elapsed > timeout:
+                process.kill()
+                result = ("errore", f"timeout dopo {timeout:.0f}s")
+            else:
+                continue
+
+            process.join()
+            conn.close()
+            del running[filename]
+            status, value = result
+            if status == "ok":
+                yield filename, value, None, elapsed, False
+            else:
+                yield filename, None, value, elapsed, status == "riprova"
+
+def extract_stream(sources, signatures, retry_quarantined=False, **limits):
+    """Estrae le domande rispettando la quarantena, un PDF alla volta
+
+    sources: [(filename, sorgente)], signatures: {filename: firma}.
+    Genera (filename, domande, voce di quarantena): domande è None per i
+    file saltati perché in quarantena o appena finiti in quarantena, e
+    anche la voce è None per i file non elaborati ma da riprovare.
+    """
+    quarantine = load_quarantine()
+    to_extract = []
+    skipped = 0
+    for filename, source in sources:
+        entry = quarantine.get(filename)
+        if entry and not retry_quarantined and entry.get("firma") == signatures.get(filename):
+            skipped += 1
+            yield filename, None, entry
+        else:
+            to_extract.append((filename, source))
+
+    if skipped:
+        print(f"⏭️  Saltati {skipped} PDF in quarantena (usa --riprova-quarantena per riprovarli)")
+
+    for filename, questions, error, elapsed, retry in extract_many(to_extract, **limits):
+        if retry:
+            print(f"⚠️  Non elaborato: {filename} ({error})")
+            yield filename, None, None
+        elif questions is None:
+            print(f"☣️  In quarantena: {filename} ({error}, {elapsed:.1f}s)")
+            quarantine[filename] = {"motivo": error, "durata": round(elapsed, 2),
+                                    "data": datetime.now().isoformat(timespec="seconds"),
+                                    "firma": signatures.get(filename)}
+            save_quarantine(quarantine)
+            yield filename, None, quarantine[filename]
+        else:
+            print(f"Elaborato: {filename} ({len(questions)} domande, {elapsed:.1f}s)")
+            if quarantine.pop(filename, None) is not None:
+                save_quarantine(quarantine)
+            yield filename, questions, None
+
+def extract_safely(sources, signatures, retry_quarantined=False, **limits):
+    """Come extract_stream, ma raccoglie i risultati
+
+    Restituisce ({filename: domande}, {filename: voce di quarantena}) per i
+    soli file elaborati o saltati in questa esecuzione; i file da riprovare
+    non compaiono in nessuno dei due.
+    """
+    results = {}
+    quarantined = {}
+    for filename, questions, entry in extract_stream(sources, signatures, retry_quarantined, **limits):
+        if questions is not None:
+            results[filename] = questions
+        elif entry is not None:
+            quarantined[filename] = entry
+    return results, quarantined
+
+def main():
+    """Mostra i PDF in quarantena; con --svuota svuota la lista"""
+    quarantine = load_quarantine()
+    if "--svuota" in sys.argv:
+        save_quarantine({})
+        print(f"🧹 Rimossi {len(quarantine)} PDF dalla quarantena")
+        return
+
+    if not quarantine:
+        print("✨ Nessun PDF in quarantena")
+        return
+    print(f"☣️  PDF IN QUARANTENA: {len(quarantine)}")
+    print("-" * 60)
+    for filename, entry in quarantine.items():
+        print(f"{filename}: {entry['motivo']} ({entry['durata']}s, {entry['data']})")
+
+if __name__ == "__main__":
+    main()
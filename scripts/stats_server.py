@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servizio HTTP locale (asyncio) per interrogare le statistiche delle domande
+
+Carica una sola volta in memoria l'indice costruito dalle partizioni in
+output/partizioni/ e risponde in JSON; le risposte hanno un ETag e sono
+tenute in cache finché non viene scritta una nuova analisi, che viene
+ricaricata automaticamente.
+
+Endpoint:
+    GET /top?n=10&da=2021&a=2024   domande più frequenti
+    GET /anni                      riepilogo per anno
+    GET /anni/<anno>               conteggi di un anno, anche per sessione
+    GET /file                      elenco dei compiti analizzati
+    GET /file/<nome>               domande di un compito
+    GET /cerca?q=cache&n=20        ricerca testuale
+"""
+
+import asyncio
+import hashlib
+import json
+import sys
+from collections import Counter, OrderedDict
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from config import ANALYSIS_OUTPUT, SERVER_CACHE_SIZE, SERVER_HOST, SERVER_PORT, SERVER_RELOAD_INTERVAL
+from question_partitions import _select_years, get_partitions_dir, list_years, load_partition
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+STATUS_TEXT = {200: "OK", 304: "Not Modified", 400: "Bad Request",
+               404: "Not Found", 405: "Method Not Allowed"}
+
+class QuestionIndex:
+    """Indice in memoria delle partizioni, con cache delle risposte"""
+
+    def __init__(self):
+        self.signature = None
+        self.years = {}
+        self.file_questions = {}
+        self.counter = Counter()
+        self.cache = OrderedDict()  # LRU: chiave normalizzata -> (status, body, etag)
+
+    def cache_get(self, key):
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+        return cached
+
+    def cache_put(self, key, value):
+        self.cache[key] = value
+        self.cache.move_to_end(key)
+        while len(self.cache) > SERVER_CACHE_SIZE:
+            self.cache.popitem(last=False)
+
+    def _current_signature(self):
+        paths = sorted(get_partitions_dir().glob("*.json")) + [PROJECT_ROOT / ANALYSIS_OUTPUT]
+        return tuple((p.name, p.stat().st_mtime_ns) for p in paths if p.exists())
+
+    def reload_if_changed(self):
+        """Ricarica l'indice se è stata scritta una nuova analisi. Restituisce True se ricaricato"""
+        signature = self._current_signature()
+        if signature == self.signature:
+            return False
+
+        years = {year: load_partition(year) for year in list_years()}
+        file_questions = {}
+        counter = Counter()
+        for partition in years.values():
+            for filename, info in partition["files"].items():
+                file_questions[filename] = info["domande"]
+            counter.update(partition["conteggi"])
+
+        self.years = years
+        self.file_questions = dict(sorted(file_questions.items()))
+        self.counter = counter
+        self.cache.clear()
+        self.signature = signature
+        return True
+
+    def top(self, n=10, start=None, end=None):
+        if start is None and end is None:
+            counter = self.counter
+        else:
+            # Stessa selezione degli anni della riga di comando (senza "sconosciuto")
+            counter = Counter()
+            for year in _select_years(start, end):
+                if year in self.years:
+                    counter.update(self.years[year]["conteggi"])
+        return [{"domanda": q, "frequenza": c} for q, c in counter.most_common(n)]
+
+    def years_summary(self):
+        return {year: {"pdf": len(p["files"]),
+                       "domande": sum(p["conteggi"].values()),
+                       "uniche": len(p["conteggi"])}
+                for year, p in self.years.items()}
+
+    def year(self, year):
+        partition = self.years.get(year)
+        if partition is None:
+            return None
+        return {"anno": year, "conteggi": partition["conteggi"], "sessioni": partition["sessioni"]}
+
+    def search(self, text, n=20):
+        words = text.lower().split()
+        matches = [(q, c) for q, c in self.counter.most_common()
+                   if all(word in q.lower() for word in words)]
+        return [{"domanda": q, "frequenza": c} for q, c in matches[:n]]
+
+def _first(query, name, default=None):
+    return query.get(name, [default])[0]
+
+def _count(query, name, default):
+    n = int(_first(query, name, default))
+    if n < 0:
+        raise ValueError(f"Parametro {name} negativo: {n}")
+    return n
+
+def route(index, path, query):
+    """Restituisce (status, dati) per un percorso"""
+    parts = [unquote(p) for p in path.strip("/").split("/") if p]
+
+    try:
+        if parts == ["top"]:
+            return 200, index.top(_count(query, "n", 10), _first(query, "da"), _first(query, "a"))
+        if parts == ["anni"]:
+            return 200, index.years_summary()
+        if len(parts) == 2 and parts[0] == "anni":
+            data = index.year(parts[1])
+            return (200, data) if data else (404, {"errore": f"Anno {parts[1]} non trovato"})
+        if parts == ["file"]:
+            return 200, list(index.file_questions)
+        if len(parts) == 2 and parts[0] == "file":
+            if parts[1] not in index.file_questions:
+                return 404, {"errore": f"File {parts[1]} non trovato"}
+            return 200, {"file": parts[1], "domande": index.file_questions[parts[1]]}
+        if parts == ["cerca"]:
+            text = _first(query, "q")
+            if not text:
+                return 400, {"errore": "Parametro q mancante"}
+            return 200, index.search(text, _count(query, "n", 20))
+    except ValueError as e:
+        return 400, {"errore": str(e)}
+
+    return 404, {"errore": "Endpoint non trovato"}
+
+def _response(status, body=b"", etag=None):
+    headers = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}",
+               "Content-Type: application/json; charset=utf-8",
+               f"Content-Length: {len(body)}",
+               "Connection: close"]
+    if etag:
+        headers.append(f"ETag: {etag}")
+        headers.append("Cache-Control: no-cache")
+    return ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body
+
+async def handle_client(index, reader, writer):
+    """Gestisce una singola richiesta HTTP"""
+    try:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if len(request_line) < 2:
+            writer.write(_response(400))
+            return
+        method, target = request_line[0], request_line[1]
+        if method not in ("GET", "HEAD"):
+            writer.write(_response(405))
+            return
+
+        # Le risposte in cache valgono finché l'indice non viene ricaricato;
+        # la chiave ignora l'ordine dei parametri
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        key = (url.path, tuple(sorted((name, tuple(values)) for name, values in query.items())))
+        cached = index.cache_get(key)
+        if cached is None:
+            status, data = route(index, url.path, query)
+            body = json.dumps(data, ensure_ascii=False, indent=1).encode("utf-8")
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"' if status == 200 else None
+            cached = (status, body, etag)
+            if status == 200:
+                index.cache_put(key, cached)
+        status, body, etag = cached
+
+        if etag and headers.get("if-none-match") == etag:
+            writer.write(_response(304, etag=etag))
+        else:
+            response = _response(status, body, etag)
+            if method == "HEAD":
+                response = response[:len(response) - len(body)]
+            writer.write(response)
+    finally:
+        await writer.drain()
+        writer.close()
+
+async def watch_reload(index, interval=SERVER_RELOAD_INTERVAL):
+    """Ricarica l'indice quando viene scritta una nuova analisi"""
+    while True:
+        await asyncio.sleep(interval)
+        if index.reload_if_changed():
+            print(f"🔄 Indice ricaricato: {len(index.file_questions)} PDF, {len(index.counter)} domande uniche")
+
+async def serve(host=SERVER_HOST, port=SERVER_PORT):
+    """Avvia il servizio finché non viene interrotto"""
+    index = QuestionIndex()
+    index.reload_if_changed()
+    print(f"📚 Indice caricato: {len(index.file_questions)} PDF, {len(index.counter)} domande uniche")
+
+    server = await asyncio.start_server(lambda r, w: handle_client(index, r, w), host, port)
+    reload_task = asyncio.create_task(watch_reload(index))
+    print(f"🌐 In ascolto su http://{host}:{port}/ (Ctrl+C per uscire)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        reload_task.cancel()
+
+def main():
+    """Funzione principale"""
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else SERVER_PORT
+    try:
+        asyncio.run(serve(port=port))
+    except KeyboardInterrupt:
+        print("\n👋 Servizio interrotto")
+
+if __name__ == "__main__":
+    main()
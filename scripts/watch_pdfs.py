@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modalità watch: analizza i nuovi PDF man mano che arrivano in pdfs/
+
+Controlla periodicamente la cartella e, dopo che le modifiche si sono
+fermate per qualche secondo, rilegge solo i PDF nuovi o modificati
+aggiornando le partizioni e il report in output/analisi_domande.txt.
+"""
+
+import os
+import sys
+import time
+from collections import Counter
+
+from config import PDF_ARCHIVE_NAME, WATCH_DEBOUNCE, WATCH_POLL_INTERVAL
+from question_partitions import merge_file_questions, update_partitions
+
+def snapshot(pdf_folder):
+    """Restituisce {filename: (mtime, dimensione)} dei PDF e dell'archivio nella cartella"""
+    state = {}
+    for entry in os.scandir(pdf_folder):
+        if (entry.name.endswith(".pdf") or entry.name == PDF_ARCHIVE_NAME) and entry.is_file():
+            stat = entry.stat()
+            state[entry.name] = (stat.st_mtime, stat.st_size)
+    return state
+
+def refresh_report():
+    """Rigenera il report completo unendo le partizioni, senza rileggere i PDF"""
+    from extract_questions import _save_results
+
+    file_questions = merge_file_questions()
+    question_counter = Counter()
+    for questions in file_questions.values():
+        question_counter.update(questions)
+    total_questions = sum(question_counter.values())
+
+    if total_questions:
+        from cooccurrence import save_cooccurrence_report
+        _save_results(question_counter, file_questions, total_questions)
+        save_cooccurrence_report(file_questions)
+    return len(file_questions), total_questions
+
+def analyze_changes(pdf_folder):
+    """Aggiorna partizioni e report, restituisce gli anni modificati"""
+    start = time.time()
+    written = update_partitions(pdf_folder)
+    if written:
+        pdf_count, total_questions = refresh_report()
+        print(f"✅ Aggiornati anni {', '.join(written)}: {pdf_count} PDF, "
+              f"{total_questions} domande ({time.time() - start:.1f}s)")
+    return written
+
+def _analyze_or_report(pdf_folder):
+    """Come analyze_changes, ma un errore viene segnalato senza fermare il watch"""
+    try:
+        return analyze_changes(pdf_folder)
+    except Exception as e:
+        print(f"❌ Analisi fallita: {type(e).__name__}: {e} (riprovo alla prossima modifica)")
+        return []
+
+def watch(pdf_folder="../pdfs", interval=WATCH_POLL_INTERVAL, debounce=WATCH_DEBOUNCE):
+    """Resta in ascolto sulla cartella finché non viene interrotto (Ctrl+C)"""
+    if not os.path.exists(pdf_folder):
+        print(f"Cartella {pdf_folder} non trovata!")
+        return
+
+    print(f"👀 In ascolto su {os.path.abspath(pdf_folder)} (Ctrl+C per uscire)")
+
+    # Allinea subito partizioni e report allo stato attuale
+    _analyze_or_report(pdf_folder)
+    last_state = snapshot(pdf_folder)
+    pending_since = None
+
+    try:
+        while True:
+            time.sleep(interval)
+            state = snapshot(pdf_folder)
+
+            if state != last_state:
+                # Raffica di modifiche in corso: aspetta che si stabilizzi
+                changed = {n for n in state.keys() | last_state.keys() if state.get(n) != last_state.get(n)}
+                print(f"📥 Modifiche rilevate: {', '.join(sorted(changed))}")
+                last_state = state
+                pending_since = time.time()
+            elif pending_since is not None and time.time() - pending_since >= debounce:
+                pending_since = None
+                _analyze_or_report(pdf_folder)
+    except KeyboardInterrupt:
+        print("\n👋 Watch interrotto")
+
+def main():
+    """Funzione principale"""
+    pdf_folder = sys.argv[1] if len(sys.argv) > 1 else "../pdfs"
+    watch(pdf_folder)
+
+if __name__ == "__main__":
+    main()